@@ -1,10 +1,9 @@
 import streamlit as st
-import os
-import tempfile
+import time
 import logging
 from utils.news_fetcher import fetch_news
-from utils.summarizer import summarize_text
-from utils.voice_generator import generate_voice_clone, load_tts_model
+from utils.summarizer import summarize_texts, load_summarizer, word_count
+from utils.voice_generator import stream_voice_clone_audio, load_tts_model, get_tts_model, get_device
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -24,6 +23,30 @@ st.markdown("### Your Celebrity-Powered Audio News Reader")
 # Check if TTS is available
 tts_available = load_tts_model()
 
+# Load the models once at startup so the first request only pays for inference.
+# The warm-up is attempted once per session: load errors are not cached, so
+# retrying on every rerun would block each widget click on a failing download.
+# The request-time paths retry loading when they need the models.
+if not st.session_state.get('models_warmed_up'):
+    st.session_state.models_warmed_up = True
+    with st.spinner("Loading models..."):
+        try:
+            load_summarizer()
+        except Exception as e:
+            logger.error(f"Error loading summarization model: {e}")
+        
+        # Trigger numba's JIT compile now rather than on the first fetch
+        try:
+            word_count("warm up")
+        except Exception as e:
+            logger.error(f"Error compiling word counter: {e}")
+        
+        if tts_available:
+            try:
+                get_tts_model(get_device())
+            except Exception as e:
+                logger.error(f"Error loading TTS model: {e}")
+
 # Sidebar for news sources and voices
 st.sidebar.header("Settings")
 
@@ -70,9 +93,30 @@ if not tts_available:
 if st.sidebar.button("Fetch Latest News"):
     with st.spinner("Fetching news..."):
         try:
-            news_items = fetch_news(news_sources[selected_source])
+            feed_meta = st.session_state.setdefault('feed_meta', {})
+            news_items = fetch_news(news_sources[selected_source], feed_cache=feed_meta)
             
             if news_items:
+                # Items already summarized in this session are looked up by link.
+                # Items without a link all default to '#', so they are not cached.
+                summary_cache = st.session_state.setdefault('summary_cache', {})
+                displayed_items = news_items[:10]  # Limit to 10 news items
+                for item in displayed_items:
+                    if item['link'] != '#' and item['link'] in summary_cache:
+                        item['summary'] = summary_cache[item['link']]
+                
+                # Summarize the remaining items in one batched call
+                pending_items = [item for item in displayed_items if 'summary' not in item]
+                if pending_items:
+                    with st.spinner("Generating summaries..."):
+                        summaries = summarize_texts([item['description'] for item in pending_items])
+                        for item, summary in zip(pending_items, summaries):
+                            item['summary'] = summary
+                            # summarize_texts returns the input unchanged on
+                            # failure, so only remember real summaries
+                            if summary != item['description'] and item['link'] != '#':
+                                summary_cache[item['link']] = summary
+                
                 st.session_state.news_items = news_items
                 st.success(f"Successfully fetched {len(news_items)} news items!")
             else:
@@ -88,15 +132,6 @@ if 'news_items' in st.session_state:
             col1, col2 = st.columns([3, 1])
             
             with col1:
-                if 'summary' not in item:
-                    with st.spinner("Generating summary..."):
-                        try:
-                            item['summary'] = summarize_text(item['description'])
-                        except Exception as e:
-                            logger.error(f"Error generating summary: {e}")
-                            item['summary'] = item['description']
-                            st.warning("Failed to generate summary. Using original text.")
-                        
                 st.markdown(f"**Original:** {item['description']}")
                 st.markdown(f"**Summary:** {item['summary']}")
                 st.markdown(f"[Read more]({item['link']})", unsafe_allow_html=True)
@@ -105,16 +140,55 @@ if 'news_items' in st.session_state:
                 audio_button = st.button(f"🔊 Play with {selected_voice}'s voice", key=f"play_{i}")
                 
                 if audio_button:
-                    with st.spinner(f"Generating audio with {selected_voice}'s voice..."):
-                        try:
-                            audio_file = generate_voice_clone(item['summary'], selected_voice)
-                            if audio_file and os.path.exists(audio_file) and os.path.getsize(audio_file) > 0:
-                                st.audio(audio_file, format='audio/wav')
-                            else:
-                                st.error("Failed to generate audio. Please check if TTS package is installed.")
-                        except Exception as e:
-                            logger.error(f"Error generating audio: {e}")
-                            st.error(f"Error generating audio: {str(e)}")
+                    audio_cache = st.session_state.setdefault('audio_cache', {})
+                    # The summary can change for a link, so it is part of the key.
+                    # Items without a link share '#' and are never cached.
+                    cacheable = item['link'] != '#'
+                    audio_key = (item['link'], selected_voice, item['summary'])
+                    
+                    if cacheable and audio_key in audio_cache:
+                        st.audio(audio_cache[audio_key], format='audio/wav', autoplay=True)
+                    else:
+                        with st.spinner(f"Generating audio with {selected_voice}'s voice..."):
+                            try:
+                                # Give each sentence its own player as soon as it is
+                                # synthesized. Each one autoplays once the previous
+                                # sentence should have finished. The pacing is
+                                # approximate: it is timed on the server, so browser
+                                # and network latency can leave small gaps or overlaps.
+                                audio_placeholder = st.empty()
+                                sentence_players = audio_placeholder.container()
+                                audio_bytes = None
+                                playback_start = None
+                                played = 0.0
+                                for clip in stream_voice_clone_audio(item['summary'], selected_voice):
+                                    if clip.complete:
+                                        audio_bytes = clip.audio
+                                        continue
+                                    
+                                    if playback_start is None:
+                                        playback_start = time.monotonic()
+                                    else:
+                                        time.sleep(max(0.0, playback_start + played - time.monotonic()))
+                                    sentence_players.audio(clip.audio, format='audio/wav', autoplay=True)
+                                    played += clip.duration
+                                
+                                if audio_bytes:
+                                    if playback_start is None:
+                                        # Served from the persistent cache
+                                        audio_placeholder.audio(audio_bytes, format='audio/wav', autoplay=True)
+                                    else:
+                                        # Let the last sentence finish, then replace the
+                                        # sentence players with one player for the full clip
+                                        time.sleep(max(0.0, playback_start + played - time.monotonic()))
+                                        audio_placeholder.audio(audio_bytes, format='audio/wav')
+                                    if cacheable:
+                                        audio_cache[audio_key] = audio_bytes
+                                else:
+                                    st.error("Failed to generate audio. Please check if TTS package is installed.")
+                            except Exception as e:
+                                logger.error(f"Error generating audio: {e}")
+                                st.error(f"Error generating audio: {str(e)}")
 else:
     st.info("Click on 'Fetch Latest News' to get started.")
 
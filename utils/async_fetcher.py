@@ -0,0 +1,84 @@
+import asyncio
+import httpx
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Maximum number of concurrent connections
+MAX_CONNECTIONS = 32
+
+def _create_async_client(headers=None, timeout=10.0):
+    """
+    Create an HTTP client for concurrent downloads
+
+    HTTP/2 is used when the h2 package is installed, so requests to the
+    same host are multiplexed over one connection.
+
+    Args:
+        headers (dict): Headers to send with every request
+        timeout (float): Per-request timeout in seconds
+
+    Returns:
+        httpx.AsyncClient: HTTP client
+    """
+    options = dict(
+        headers=headers,
+        timeout=timeout,
+        follow_redirects=True,
+        limits=httpx.Limits(max_connections=MAX_CONNECTIONS)
+    )
+    try:
+        return httpx.AsyncClient(http2=True, **options)
+    except ImportError:
+        logger.warning("Could not import h2. Falling back to HTTP/1.1.")
+        return httpx.AsyncClient(**options)
+
+async def fetch_article(client, url):
+    """
+    Download a single page
+
+    Args:
+        client (httpx.AsyncClient): Client to use
+        url (str): URL of the page
+
+    Returns:
+        str: Page HTML or None if the fetch failed
+    """
+    try:
+        response = await client.get(url)
+        response.raise_for_status()
+        return response.text
+    except Exception as e:
+        logger.error(f"Error fetching article content: {e}")
+        return None
+
+async def fetch_all(urls, headers=None, timeout=10.0):
+    """
+    Download several pages concurrently on one event loop
+
+    Args:
+        urls (list): URLs of the pages
+        headers (dict): Headers to send with every request
+        timeout (float): Per-request timeout in seconds
+
+    Returns:
+        list: Page HTML (or None on failure) in the same order as urls
+    """
+    async with _create_async_client(headers=headers, timeout=timeout) as client:
+        return await asyncio.gather(*[fetch_article(client, url) for url in urls])
+
+def fetch_all_sync(urls, headers=None, timeout=10.0):
+    """
+    Download several pages concurrently from synchronous code
+
+    Args:
+        urls (list): URLs of the pages
+        headers (dict): Headers to send with every request
+        timeout (float): Per-request timeout in seconds
+
+    Returns:
+        list: Page HTML (or None on failure) in the same order as urls
+    """
+    return asyncio.run(fetch_all(urls, headers=headers, timeout=timeout))
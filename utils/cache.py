@@ -0,0 +1,151 @@
+import os
+import hashlib
+import logging
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Cache backend configuration
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+CACHE_DIR = os.getenv("NEWSBREEZE_CACHE_DIR", ".cache")
+
+# Entries expire after a week by default
+CACHE_TTL = int(os.getenv("NEWSBREEZE_CACHE_TTL", 7 * 24 * 3600))
+
+_backend = None
+_backend_name = None
+
+def _get_backend():
+    """
+    Connect to the persistent cache backend
+
+    Redis is used when a server is reachable, otherwise a local diskcache
+    directory. If neither is available caching is disabled.
+
+    Returns:
+        object: Redis client, diskcache.Cache or None
+    """
+    global _backend, _backend_name
+
+    if _backend_name is not None:
+        return _backend
+
+    try:
+        import redis
+        client = redis.Redis.from_url(REDIS_URL, socket_connect_timeout=1)
+        client.ping()
+        _backend, _backend_name = client, "redis"
+        logger.info(f"Using Redis cache at {REDIS_URL}")
+        return _backend
+    except ImportError:
+        logger.info("redis package is not installed, trying diskcache")
+    except Exception as e:
+        logger.info(f"Redis is not reachable ({e}), trying diskcache")
+
+    try:
+        import diskcache
+        _backend, _backend_name = diskcache.Cache(CACHE_DIR), "diskcache"
+        logger.info(f"Using disk cache at {CACHE_DIR}")
+    except ImportError:
+        _backend, _backend_name = None, "none"
+        logger.warning("Neither redis nor diskcache is installed. Persistent caching is disabled.")
+    except Exception as e:
+        _backend, _backend_name = None, "none"
+        logger.warning(f"Error opening disk cache: {e}. Persistent caching is disabled.")
+
+    return _backend
+
+def make_key(namespace, *parts):
+    """
+    Build a content-addressed cache key
+
+    Args:
+        namespace (str): Key prefix, e.g. "summary" or "audio"
+        *parts (str): Values the cached result depends on
+
+    Returns:
+        str: Cache key
+    """
+    digest = hashlib.sha1("\0".join(parts).encode("utf-8")).hexdigest()
+    return f"newsbreeze:{namespace}:{digest}"
+
+def _encode(value):
+    """
+    Serialize a cache value, tagging its type with a one-byte prefix
+
+    Args:
+        value (str or bytes): Value to store
+
+    Returns:
+        bytes: Serialized value
+    """
+    if isinstance(value, bytes):
+        return b"b" + value
+    if isinstance(value, str):
+        return b"s" + value.encode("utf-8")
+    raise TypeError(f"Cannot cache values of type {type(value).__name__}")
+
+def _decode(data):
+    """
+    Deserialize a value written by _encode
+
+    Args:
+        data (bytes): Serialized value or None
+
+    Returns:
+        str or bytes: Cached value, or None for a miss or unknown data
+    """
+    if not isinstance(data, bytes) or not data:
+        return None
+    tag, payload = data[:1], data[1:]
+    if tag == b"b":
+        return payload
+    if tag == b"s":
+        return payload.decode("utf-8")
+    return None
+
+def cache_get(key):
+    """
+    Look up a value in the persistent cache
+
+    Args:
+        key (str): Cache key
+
+    Returns:
+        object: Cached value or None on a miss
+    """
+    backend = _get_backend()
+    if backend is None:
+        return None
+
+    try:
+        return _decode(backend.get(key))
+    except Exception as e:
+        logger.warning(f"Error reading from cache: {e}")
+        return None
+
+def cache_set(key, value):
+    """
+    Store a value in the persistent cache
+
+    Args:
+        key (str): Cache key
+        value (object): Value to store (str or bytes)
+    """
+    backend = _get_backend()
+    if backend is None:
+        return
+
+    try:
+        data = _encode(value)
+        if _backend_name == "redis":
+            backend.set(key, data, ex=CACHE_TTL)
+        else:
+            backend.set(key, data, expire=CACHE_TTL)
+    except Exception as e:
+        logger.warning(f"Error writing to cache: {e}")
@@ -1,25 +1,85 @@
 import feedparser
-import requests
-from bs4 import BeautifulSoup
+import httpx
+from selectolax.parser import HTMLParser
+from concurrent.futures import ThreadPoolExecutor
 import logging
+from utils.async_fetcher import fetch_all_sync
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def fetch_news(rss_url):
+# Maximum number of concurrent article fetches
+MAX_FETCH_WORKERS = 8
+
+# Elements that usually hold the article text
+CONTENT_SELECTOR = 'article, main, div.content, div.article-content, div.story-content, div.entry-content'
+
+# Headers sent with every request
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+def _create_client():
+    """
+    Create the shared HTTP client
+    
+    HTTP/2 is used when the h2 package is installed, otherwise HTTP/1.1
+    with keep-alive. gzip/deflate encoding is negotiated automatically.
+    
+    Returns:
+        httpx.Client: Thread-safe HTTP client
+    """
+    options = dict(
+        headers=HEADERS,
+        timeout=10.0,
+        follow_redirects=True,
+        limits=httpx.Limits(max_connections=MAX_FETCH_WORKERS * 2, max_keepalive_connections=MAX_FETCH_WORKERS)
+    )
+    try:
+        return httpx.Client(http2=True, **options)
+    except ImportError:
+        logger.warning("Could not import h2. Falling back to HTTP/1.1.")
+        return httpx.Client(**options)
+
+# Shared HTTP client so feed and article fetches reuse pooled connections
+_client = _create_client()
+
+def fetch_news(rss_url, feed_cache=None):
     """
     Fetch news from RSS feed
     
+    When a feed_cache dict is given, the ETag and Last-Modified headers of
+    the previous response are sent back so an unchanged feed is answered
+    with 304 and the previously parsed items are reused.
+    
     Args:
         rss_url (str): URL of the RSS feed
+        feed_cache (dict): Per-URL validators and items from earlier fetches
         
     Returns:
         list: List of dictionaries containing news items
     """
     try:
-        # Parse the RSS feed
-        feed = feedparser.parse(rss_url)
+        meta = feed_cache.get(rss_url, {}) if feed_cache is not None else {}
+        
+        # Revalidate the feed with a conditional GET
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('modified'):
+            headers['If-Modified-Since'] = meta['modified']
+        
+        response = _client.get(rss_url, headers=headers)
+        
+        if response.status_code == 304 and meta.get('news_items'):
+            logger.info(f"Feed not modified, reusing cached items: {rss_url}")
+            return [dict(item) for item in meta['news_items']]
+        
+        response.raise_for_status()
+        
+        # Parse the RSS feed from the downloaded bytes
+        feed = feedparser.parse(response.content)
         
         # Check if feed parsed successfully
         if feed.get('bozo_exception'):
@@ -37,21 +97,93 @@ def fetch_news(rss_url):
                 'published': entry.get('published', 'No date')
             }
             
-            # Try to fetch full content if description is too short
-            if len(item['description']) < 100 and 'link' in item:
-                try:
-                    item['description'] = fetch_article_content(item['link'])
-                except Exception as e:
-                    logger.warning(f"Failed to fetch full content: {e}")
-            
             news_items.append(item)
         
+        # Fetch full content for items whose description is too short,
+        # overlapping the network round trips
+        needs_fetch = [i for i, it in enumerate(news_items) if len(it['description']) < 100]
+        if needs_fetch:
+            links = [news_items[i]['link'] for i in needs_fetch]
+            for i, content in zip(needs_fetch, fetch_articles(links)):
+                if content is not None:
+                    news_items[i]['description'] = content
+        
+        if feed_cache is not None:
+            feed_cache[rss_url] = {
+                'etag': response.headers.get('ETag'),
+                'modified': response.headers.get('Last-Modified'),
+                'news_items': [dict(item) for item in news_items]
+            }
+        
         return news_items
     
     except Exception as e:
         logger.error(f"Error fetching news: {e}")
         return []
 
+def fetch_articles(urls, max_length=1000):
+    """
+    Fetch the content of several articles concurrently
+    
+    The pages are downloaded with asyncio.gather on an httpx.AsyncClient,
+    then parsed one after another. If an event loop is already running in
+    this thread, the downloads fall back to a thread pool on the shared
+    client.
+    
+    Args:
+        urls (list): URLs of the articles
+        max_length (int): Maximum length of content to return
+        
+    Returns:
+        list: Article content (or None on failure) in the same order as urls
+    """
+    try:
+        pages = fetch_all_sync(urls, headers=HEADERS)
+    except RuntimeError as e:
+        logger.warning(f"Could not fetch articles asynchronously ({e}). Falling back to threads.")
+        with ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS) as executor:
+            return list(executor.map(lambda url: _fetch_full_content(url, max_length), urls))
+    
+    # Parsing is CPU bound, so it stays outside the event loop
+    return [_extract_page(html_text, max_length) for html_text in pages]
+
+def _extract_page(html_text, max_length=1000):
+    """
+    Extract article content from a downloaded page
+    
+    Args:
+        html_text (str): Page HTML or None if the download failed
+        max_length (int): Maximum length of content to return
+        
+    Returns:
+        str: Article content or None if the download failed
+    """
+    if html_text is None:
+        return None
+    
+    try:
+        return extract_article_content(html_text, max_length)
+    except Exception as e:
+        logger.error(f"Error extracting article content: {e}")
+        return "Content not available"
+
+def _fetch_full_content(url, max_length=1000):
+    """
+    Fetch full article content, returning None on failure
+    
+    Args:
+        url (str): URL of the article
+        max_length (int): Maximum length of content to return
+        
+    Returns:
+        str: Article content or None if the fetch failed
+    """
+    try:
+        return fetch_article_content(url, max_length=max_length, client=_client)
+    except Exception as e:
+        logger.warning(f"Failed to fetch full content: {e}")
+        return None
+
 def clean_html(html_text):
     """
     Remove HTML tags from text
@@ -63,61 +195,76 @@ def clean_html(html_text):
         str: Clean text
     """
     try:
-        soup = BeautifulSoup(html_text, 'html.parser')
-        return soup.get_text(separator=' ', strip=True)
+        tree = HTMLParser(html_text)
+        return tree.text(separator=' ', strip=True)
     except Exception as e:
         logger.error(f"Error cleaning HTML: {e}")
         return html_text
 
-def fetch_article_content(url, max_length=1000):
+def fetch_article_content(url, max_length=1000, client=None):
     """
     Fetch article content from URL
     
     Args:
         url (str): URL of the article
         max_length (int): Maximum length of content to return
+        client (httpx.Client): Client to use, defaults to the shared client
         
     Returns:
         str: Article content
     """
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=10)
+        client = client or _client
+        response = client.get(url)
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Try to find the main content
-        # This is a simple approach and might need adjustment for specific sites
-        content = ''
-        
-        # Look for article tags
-        article = soup.find('article')
-        if article:
-            content = article.get_text(separator=' ', strip=True)
-        
-        # If no article tag, look for main tag
-        if not content:
-            main = soup.find('main')
-            if main:
-                content = main.get_text(separator=' ', strip=True)
-        
-        # If still no content, look for div with common content class names
-        if not content:
-            for div in soup.find_all('div', class_=['content', 'article-content', 'story-content', 'entry-content']):
-                content = div.get_text(separator=' ', strip=True)
-                if content:
-                    break
-        
-        # If still no content, use body
-        if not content:
-            content = soup.body.get_text(separator=' ', strip=True)
-        
-        # Limit content length
-        return content[:max_length]
+        return extract_article_content(response.text, max_length)
     
     except Exception as e:
         logger.error(f"Error fetching article content: {e}")
-        return "Content not available" 
\ No newline at end of file
+        return "Content not available"
+
+def extract_article_content(html_text, max_length=1000):
+    """
+    Extract the main text of an article page
+    
+    Args:
+        html_text (str): HTML of the article page
+        max_length (int): Maximum length of content to return
+        
+    Returns:
+        str: Article content
+    """
+    tree = HTMLParser(html_text)
+    
+    # Try to find the main content
+    # This is a simple approach and might need adjustment for specific sites
+    content = ''
+    
+    # Collect all candidate nodes in a single selector pass, then try them
+    # in priority order: the first article, the first main, then divs with
+    # common content class names
+    first_article = first_main = None
+    content_divs = []
+    for node in tree.css(CONTENT_SELECTOR):
+        if node.tag == 'article':
+            if first_article is None:
+                first_article = node
+        elif node.tag == 'main':
+            if first_main is None:
+                first_main = node
+        else:
+            content_divs.append(node)
+    
+    for node in [first_article, first_main] + content_divs:
+        if node is not None:
+            content = node.text(separator=' ', strip=True)
+            if content:
+                break
+    
+    # If still no content, use body
+    if not content and tree.body:
+        content = tree.body.text(separator=' ', strip=True)
+    
+    # Limit content length
+    return content[:max_length]
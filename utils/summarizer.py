@@ -1,7 +1,11 @@
 import os
+import re
 import logging
-from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM
+import torch
+import streamlit as st
+from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
 from dotenv import load_dotenv
+from utils.cache import make_key, cache_get, cache_set
 
 # Load environment variables
 load_dotenv()
@@ -10,52 +14,185 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Global variable for the summarizer
-summarizer = None
+# Try to import numba to JIT-compile the word counter
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    logger.info("numba is not installed, using the pure Python word counter")
 
+# Hugging Face summarization model
+MODEL_NAME = "Falconsai/text_summarization"
+
+# Bump when input handling or decoding changes so cached summaries are regenerated
+SUMMARY_CACHE_VERSION = "2"
+
+# Quantize the summarization model's linear layers to int8 (set to "0" to disable)
+QUANTIZE_SUMMARIZER = os.getenv("QUANTIZE_SUMMARIZER", "1") != "0"
+
+@st.cache_resource(show_spinner=False)
+def load_tokenizer():
+    """
+    Load the tokenizer for the summarization model
+    
+    Takes no arguments so every caller shares one cached instance.
+    
+    Returns:
+        AutoTokenizer: Hugging Face tokenizer
+    """
+    # Get API key from environment variables
+    api_key = os.getenv("HUGGINGFACE_API_KEY")
+    
+    if api_key:
+        return AutoTokenizer.from_pretrained(MODEL_NAME, use_auth_token=api_key)
+    return AutoTokenizer.from_pretrained(MODEL_NAME)
+
+@st.cache_resource(show_spinner=False)
 def load_summarizer():
     """
     Load the summarization model
     
+    The model is cached with Streamlit so that all reruns and sessions
+    share a single instance. Load errors are raised rather than cached so
+    that a later call can retry.
+    
     Returns:
-        pipeline: Hugging Face summarization pipeline
+        tuple: (tokenizer, model) for the summarization model
     """
-    global summarizer
+    logger.info("Loading summarization model...")
     
-    try:
-        if summarizer is None:
-            logger.info("Loading summarization model...")
-            
-            # Get API key from environment variables
-            api_key = os.getenv("HUGGINGFACE_API_KEY")
-            
-            # Use Falconsai/text_summarization model
-            model_name = "Falconsai/text_summarization"
-            
-            # Load tokenizer and model with API key if available
-            if api_key:
-                logger.info("Using Hugging Face API key")
-                tokenizer = AutoTokenizer.from_pretrained(model_name, use_auth_token=api_key)
-                model = AutoModelForSeq2SeqLM.from_pretrained(model_name, use_auth_token=api_key)
-            else:
-                logger.warning("No Hugging Face API key found, trying to download models anonymously")
-                tokenizer = AutoTokenizer.from_pretrained(model_name)
-                model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
-            
-            # Create summarization pipeline
-            summarizer = pipeline("summarization", model=model, tokenizer=tokenizer)
+    # Get API key from environment variables
+    api_key = os.getenv("HUGGINGFACE_API_KEY")
+    
+    # Load tokenizer and model with API key if available
+    tokenizer = load_tokenizer()
+    if api_key:
+        logger.info("Using Hugging Face API key")
+        model = AutoModelForSeq2SeqLM.from_pretrained(MODEL_NAME, use_auth_token=api_key)
+    else:
+        logger.warning("No Hugging Face API key found, trying to download models anonymously")
+        model = AutoModelForSeq2SeqLM.from_pretrained(MODEL_NAME)
+    
+    # The model runs on CPU, where int8 dynamic quantization of the
+    # linear layers roughly halves inference time and memory footprint
+    if QUANTIZE_SUMMARIZER:
+        try:
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            logger.info("Summarization model quantized to int8.")
+        except Exception as e:
+            logger.warning(f"Could not quantize summarization model, using fp32: {e}")
+    
+    model.eval()
+    
+    logger.info("Summarization model loaded successfully.")
+    
+    return tokenizer, model
+
+# Checkpoint generation settings that summarize_texts sets itself, and
+# beam-search-only settings that have no effect with greedy decoding
+_OVERRIDDEN_TASK_PARAMS = {
+    'prefix', 'num_beams', 'max_length', 'min_length', 'do_sample', 'use_cache',
+    'early_stopping', 'length_penalty'
+}
+
+def _summarization_params(model):
+    """
+    Get the checkpoint's summarization settings
+    
+    The summarization pipeline applied the model's
+    task_specific_params['summarization'] block; this keeps the same input
+    prefix and passes the remaining generation settings (such as
+    no_repeat_ngram_size, which stops greedy decoding from looping on a
+    phrase) through to generate.
+    
+    Args:
+        model (PreTrainedModel): Summarization model
+        
+    Returns:
+        tuple: (prefix, generate_kwargs), e.g. ("summarize: ", {"no_repeat_ngram_size": 3})
+    """
+    task_params = (getattr(model.config, 'task_specific_params', None) or {}).get('summarization', {})
+    prefix = task_params.get('prefix') or getattr(model.config, 'prefix', None) or ''
+    generate_kwargs = {k: v for k, v in task_params.items() if k not in _OVERRIDDEN_TASK_PARAMS}
+    return prefix, generate_kwargs
+
+def _word_count(text):
+    """
+    Count whitespace-separated words without building a list of them
+    
+    Args:
+        text (str): Text to count
+        
+    Returns:
+        int: Number of words
+    """
+    count = 0
+    in_word = False
+    for c in text:
+        if c.isspace():
+            in_word = False
+        elif not in_word:
+            in_word = True
+            count += 1
+    return count
+
+if NUMBA_AVAILABLE:
+    word_count = njit(cache=True)(_word_count)
+else:
+    def word_count(text):
+        """
+        Count whitespace-separated words
+        
+        Args:
+            text (str): Text to count
             
-            logger.info("Summarization model loaded successfully.")
+        Returns:
+            int: Number of words
+        """
+        return len(text.split())
+
+def lead_sentences(text, count=2):
+    """
+    Get the first sentences of a text
+    
+    Args:
+        text (str): Text to shorten
+        count (int): Number of sentences to keep
         
-        return summarizer
+    Returns:
+        str: The first sentences of the text
+    """
+    return ' '.join(re.split(r'(?<=[.!?])\s+', text.strip())[:count])
+
+def _summary_cache_key(text, max_length, min_length):
+    """
+    Build the persistent cache key for a summary
     
-    except Exception as e:
-        logger.error(f"Error loading summarization model: {e}")
-        return None
+    The key covers the model, quantization and decoding settings so that
+    changing any of them does not serve stale summaries.
+    
+    Args:
+        text (str): Text to summarize
+        max_length (int): Maximum length of summary
+        min_length (int): Minimum length of summary
+        
+    Returns:
+        str: Cache key
+    """
+    return make_key(
+        "summary",
+        SUMMARY_CACHE_VERSION,
+        MODEL_NAME,
+        f"int8={QUANTIZE_SUMMARIZER}",
+        str(max_length),
+        str(min_length),
+        text
+    )
 
 def summarize_text(text, max_length=150, min_length=30):
     """
-    Summarize text using Hugging Face's summarization pipeline
+    Summarize text using the Hugging Face summarization model
     
     Args:
         text (str): Text to summarize
@@ -65,40 +202,101 @@ def summarize_text(text, max_length=150, min_length=30):
     Returns:
         str: Summarized text
     """
+    return summarize_texts([text], max_length=max_length, min_length=min_length)[0]
+
+def summarize_texts(texts, max_length=150, min_length=30, batch_size=8):
+    """
+    Summarize several texts with batched calls to the summarization model
+    
+    Args:
+        texts (list): Texts to summarize
+        max_length (int): Maximum length of each summary
+        min_length (int): Minimum length of each summary
+        batch_size (int): Number of texts per forward pass
+        
+    Returns:
+        list: Summarized texts, in the same order as the input. Texts under
+        min_length words or that fail to summarize are returned unchanged,
+        and texts under 2 * min_length tokens are cut to their first two
+        sentences.
+    """
+    summaries = list(texts)
+    
     try:
-        # Check if text is too short
-        if len(text.split()) < min_length:
-            return text
+        # Only texts long enough are sent to the model
+        indices = [i for i, text in enumerate(texts) if word_count(text) >= min_length]
         
-        # Load summarizer if not already loaded
-        sum_pipeline = load_summarizer()
+        # Serve previously summarized texts from the persistent cache
+        keys = {i: _summary_cache_key(texts[i], max_length, min_length) for i in indices}
+        misses = []
+        for i in indices:
+            summary = cache_get(keys[i])
+            if summary is not None:
+                summaries[i] = summary
+            else:
+                misses.append(i)
+        indices = misses
         
-        if sum_pipeline is None:
-            logger.error("Failed to load summarizer.")
-            return text
+        # Texts too short for a useful summary are cut to their first
+        # sentences without running the model. Tokenization stops at the
+        # threshold, so long texts are not fully tokenized just to be counted.
+        short_limit = 2 * min_length
+        if indices:
+            try:
+                tokenizer = load_tokenizer()
+                encoded = tokenizer([texts[i] for i in indices], truncation=True, max_length=short_limit)
+                short = {i for i, ids in zip(indices, encoded['input_ids']) if len(ids) < short_limit}
+                for i in short:
+                    summaries[i] = lead_sentences(texts[i])
+                indices = [i for i in indices if i not in short]
+            except Exception as e:
+                logger.warning(f"Could not count tokens, summarizing all texts: {e}")
         
-        # Truncate input text if it's too long
-        max_input_length = 1024  # Most models have a limit
-        tokenizer = sum_pipeline.tokenizer
+        if not indices:
+            return summaries
         
-        # Tokenize and truncate if necessary
-        tokens = tokenizer.encode(text, truncation=True, max_length=max_input_length)
-        truncated_text = tokenizer.decode(tokens, skip_special_tokens=True)
+        # Load summarizer if not already loaded
+        try:
+            tokenizer, model = load_summarizer()
+        except Exception as e:
+            logger.error(f"Failed to load summarizer: {e}")
+            return summaries
         
-        # Generate summary
-        summary = sum_pipeline(
-            truncated_text,
-            max_length=max_length,
-            min_length=min_length,
-            do_sample=False
-        )
+        prefix, generate_kwargs = _summarization_params(model)
+        
+        for start in range(0, len(indices), batch_size):
+            batch = indices[start:start + batch_size]
+            
+            # Pad to the longest text in the batch and truncate to the
+            # model's maximum input length
+            encoded = tokenizer(
+                [prefix + texts[i] for i in batch],
+                padding=True,
+                truncation=True,
+                return_tensors='pt'
+            ).to(model.device)
+            
+            # Generate summaries with greedy decoding
+            with torch.inference_mode():
+                output_ids = model.generate(
+                    **encoded,
+                    **generate_kwargs,
+                    max_length=max_length,
+                    min_length=min_length,
+                    num_beams=1,
+                    do_sample=False,
+                    use_cache=True
+                )
+            
+            # Extract summary texts
+            for i, summary in zip(batch, tokenizer.batch_decode(output_ids, skip_special_tokens=True)):
+                summary = summary.strip()
+                if summary:
+                    summaries[i] = summary
+                    cache_set(keys[i], summary)
         
-        # Extract summary text
-        if summary and len(summary) > 0:
-            return summary[0]['summary_text']
-        else:
-            return text
+        return summaries
     
     except Exception as e:
         logger.error(f"Error summarizing text: {e}")
-        return text 
\ No newline at end of file
+        return summaries
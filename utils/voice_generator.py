@@ -1,12 +1,16 @@
+import io
 import os
+import re
+import contextlib
+from collections import namedtuple
 import torch
+import numpy as np
+import soundfile as sf
 import logging
-import tempfile
+import streamlit as st
 from dotenv import load_dotenv
 import time
-
-# Flag for audio processing
-AUDIO_PROCESSING_AVAILABLE = False
+from utils.cache import make_key, cache_get, cache_set
 
 # Load environment variables
 load_dotenv()
@@ -15,16 +19,20 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Try to import pydub for audio processing
-try:
-    from pydub import AudioSegment
-    AUDIO_PROCESSING_AVAILABLE = True
-    logger.info("Audio processing is available")
-except ImportError:
-    logger.warning("Could not import pydub. Audio processing will be disabled.")
-except Exception as e:
-    logger.warning(f"Error importing audio libraries: {e}")
-    logger.warning("Audio processing will be disabled.")
+# A playable piece of generated speech; complete is True for the full audio
+AudioClip = namedtuple("AudioClip", ["audio", "duration", "complete"])
+
+# Coqui TTS model used for voice cloning
+TTS_MODEL_NAME = "tts_models/multilingual/multi-dataset/xtts_v2"
+
+# Bump when synthesis changes so cached audio is regenerated
+AUDIO_CACHE_VERSION = "3"
+
+# Run TTS inference under fp16 autocast on CUDA (set to "0" to disable)
+TTS_HALF_PRECISION = os.getenv("TTS_HALF_PRECISION", "1") != "0"
+
+# Compile the TTS vocoder with torch.compile on CUDA (set to "1" to enable)
+TTS_COMPILE = os.getenv("TTS_COMPILE", "0") == "1"
 
 def load_tts_model():
     """
@@ -48,6 +56,68 @@ def load_tts_model():
         logger.error(f"Error checking TTS model: {e}")
         return False
 
+def get_device():
+    """
+    Get the device to run the TTS model on
+    
+    Returns:
+        str: "cuda" if available, otherwise "cpu"
+    """
+    # Check if CUDA is available
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+@st.cache_resource(show_spinner=False)
+def get_tts_model(device):
+    """
+    Load the XTTS-v2 model once and share it across reruns and sessions
+    
+    Args:
+        device (str): Device to load the model on ("cuda" or "cpu")
+        
+    Returns:
+        TTS: Coqui TTS model instance
+    """
+    from TTS.api import TTS
+    
+    # Get API key from environment variables
+    api_key = os.getenv("COQUI_API_KEY")
+    
+    logger.info(f"Loading TTS model on device: {device}")
+    
+    # Initialize the TTS model
+    if api_key:
+        logger.info("Using Coqui API key")
+        # For cloud API, you might need to use a different initialization
+        tts_model = TTS(TTS_MODEL_NAME, coqui_api_key=api_key).to(device)
+    else:
+        logger.warning("No Coqui API key found, using local model")
+        tts_model = TTS(TTS_MODEL_NAME).to(device)
+    
+    # Optionally compile the vocoder, which runs on every synthesized chunk
+    if TTS_COMPILE and device == "cuda" and hasattr(torch, "compile"):
+        try:
+            xtts = tts_model.synthesizer.tts_model
+            xtts.hifigan_decoder = torch.compile(xtts.hifigan_decoder, mode="reduce-overhead")
+            logger.info("Compiled the TTS vocoder with torch.compile")
+        except Exception as e:
+            logger.warning(f"Could not compile the TTS model: {e}")
+    
+    return tts_model
+
+def _inference_context(device):
+    """
+    Get the autocast context for TTS inference
+    
+    Args:
+        device (str): Device the TTS model is loaded on
+        
+    Returns:
+        context manager: fp16 autocast on CUDA, otherwise a no-op
+    """
+    if device == "cuda" and TTS_HALF_PRECISION:
+        return torch.autocast(device_type="cuda", dtype=torch.float16)
+    return contextlib.nullcontext()
+
 def get_reference_audio_path(celebrity):
     """
     Get the path to the reference audio for the celebrity
@@ -86,16 +156,150 @@ def get_reference_audio_path(celebrity):
             logger.error(f"Error getting reference audio: {e}")
             return None
 
-def generate_voice_clone(text, celebrity):
+@st.cache_resource(show_spinner=False)
+def get_speaker_latents(celebrity, device):
+    """
+    Compute the XTTS speaker conditioning for a celebrity once
+    
+    Args:
+        celebrity (str): Name of the celebrity
+        device (str): Device the TTS model is loaded on
+        
+    Returns:
+        tuple: (gpt_cond_latent, speaker_embedding) tensors on the device
+    """
+    reference_audio = get_reference_audio_path(celebrity)
+    xtts = get_tts_model(device).synthesizer.tts_model
+    
+    logger.info(f"Computing speaker latents for {celebrity}")
+    with torch.inference_mode():
+        gpt_cond_latent, speaker_embedding = xtts.get_conditioning_latents(audio_path=[reference_audio])
+    
+    return gpt_cond_latent.detach().to(device), speaker_embedding.detach().to(device)
+
+def split_sentences(text):
+    """
+    Split text into sentences for chunked synthesis
+    
+    Args:
+        text (str): Text to split
+        
+    Returns:
+        list: Non-empty sentences
+    """
+    return [sentence for sentence in re.split(r'(?<=[.!?])\s+', text.strip()) if sentence]
+
+def stream_voice_clone(text, celebrity):
+    """
+    Synthesize speech sentence by sentence
+    
+    Args:
+        text (str): Text to convert to speech
+        celebrity (str): Name of the celebrity
+        
+    Yields:
+        numpy.ndarray: float32 waveform for each sentence
+    """
+    device = get_device()
+    logger.info(f"Using device: {device}")
+    
+    # Reuse the cached TTS model instead of reloading it on every request
+    tts_model = get_tts_model(device)
+    
+    # Get reference audio path
+    reference_audio = get_reference_audio_path(celebrity)
+    
+    # Reuse the speaker conditioning computed once per celebrity. This is the
+    # only per-speaker work shared between sentences: XTTS's inference() and
+    # inference_stream() do not accept or return GPT past_key_values, and the
+    # GPT prompt is the conditioning latents followed by the sentence's text
+    # tokens, so every sentence still has to run its own prefill.
+    latents =get_speaker_latents(celebrity, device) if reference_audio else None
+    
+    for sentence in split_sentences(text):
+        logger.info(f"Generating speech for: {sentence[:50]}...")
+        
+        if latents:
+            # Use voice cloning with the cached speaker latents
+            gpt_cond_latent, speaker_embedding = latents
+            with torch.inference_mode(), _inference_context(device):
+                out = tts_model.synthesizer.tts_model.inference(
+                    sentence,
+                    "en",
+                    gpt_cond_latent,
+                    speaker_embedding
+                )
+            wav = _to_numpy(out["wav"])
+        else:
+            # Fallback to default voice if reference audio is not available
+            with _inference_context(device):
+                wav = _to_numpy(tts_model.tts(text=sentence, language="en"))
+        
+        # Release cached GPU memory between sentences to bound peak VRAM
+        if device == "cuda":
+            torch.cuda.empty_cache()
+        
+        yield wav
+
+def _to_numpy(wav):
     """
-    Generate voice clone of a celebrity
+    Convert a TTS output waveform to a float32 numpy array
+    
+    Args:
+        wav (torch.Tensor or list): Waveform returned by the TTS model
+        
+    Returns:
+        numpy.ndarray: float32 waveform
+    """
+    if torch.is_tensor(wav):
+        wav = wav.detach().float().cpu().numpy()
+    return np.asarray(wav, dtype=np.float32).reshape(-1)
+
+def _audio_cache_key(text, celebrity):
+    """
+    Build the persistent cache key for generated audio
+    
+    The key covers the model and precision settings and the reference clip,
+    so audio made with the default voice is not served once a clip is added.
     
     Args:
         text (str): Text to convert to speech
         celebrity (str): Name of the celebrity
         
     Returns:
-        str: Path to the generated audio file or None if not available
+        str: Cache key
+    """
+    reference_audio = get_reference_audio_path(celebrity) or ""
+    reference_mtime = str(os.path.getmtime(reference_audio)) if reference_audio else ""
+    return make_key(
+        "audio",
+        AUDIO_CACHE_VERSION,
+        TTS_MODEL_NAME,
+        f"fp16={TTS_HALF_PRECISION and get_device() == 'cuda'}",
+        reference_audio,
+        reference_mtime,
+        text,
+        celebrity
+    )
+
+def stream_voice_clone_audio(text, celebrity):
+    """
+    Generate voice clone of a celebrity, one sentence at a time
+    
+    Each sentence is yielded as its own short clip as soon as it is
+    synthesized, so the caller can start playback after the first sentence
+    without re-sending earlier audio. The last value is the complete audio,
+    which is stored in the persistent cache; on a cache hit it is the only
+    value. Nothing is yielded if TTS is not available, and synthesis errors
+    are raised after any partial audio.
+    
+    Args:
+        text (str): Text to convert to speech
+        celebrity (str): Name of the celebrity
+        
+    Yields:
+        AudioClip: WAV audio data, its duration, and whether it is the
+        complete audio
     """
     try:
         # Check if TTS is available
@@ -103,118 +307,64 @@ def generate_voice_clone(text, celebrity):
         
         if not tts_available:
             logger.error("TTS functionality is not available.")
-            
-            # For demo purposes, create a placeholder audio file with a message
-            fd, output_path = tempfile.mkstemp(suffix='.wav')
-            os.close(fd)
-            
-            # Write message to file explaining TTS is not available
-            with open(output_path, 'w') as f:
-                f.write(f"TTS is not available. Please install the TTS package to use voice cloning.")
-            
-            logger.info(f"Created placeholder file: {output_path}")
-            return output_path
+            return
         
-        # If TTS is available, continue with the actual implementation
-        from TTS.api import TTS
+        # Serve previously generated audio from the persistent cache
+        key = _audio_cache_key(text, celebrity)
+        audio_bytes = cache_get(key)
+        if audio_bytes is not None:
+            yield AudioClip(audio_bytes, sf.info(io.BytesIO(audio_bytes)).duration, True)
+            return
         
-        # Get API key from environment variables
-        api_key = os.getenv("COQUI_API_KEY")
+        sample_rate = get_tts_model(get_device()).synthesizer.output_sample_rate
         
-        # Check if CUDA is available
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        logger.info(f"Using device: {device}")
+        # Sentence clips are played as synthesized; the full audio is
+        # normalized with a single gain so relative levels between sentences
+        # are preserved, as when the whole clip was normalized at once
+        sentences = []
+        for wav in stream_voice_clone(text, celebrity):
+            sentences.append(wav)
+            yield AudioClip(_encode_wav(wav, sample_rate), len(wav) / sample_rate, False)
         
-        # Initialize the TTS model
-        if api_key:
-            logger.info("Using Coqui API key")
-            # For cloud API, you might need to use a different initialization
-            tts_model = TTS("tts_models/multilingual/multi-dataset/xtts_v2", coqui_api_key=api_key).to(device)
-        else:
-            logger.warning("No Coqui API key found, using local model")
-            tts_model = TTS("tts_models/multilingual/multi-dataset/xtts_v2").to(device)
-        
-        # Get reference audio path
-        reference_audio = get_reference_audio_path(celebrity)
-        
-        # Create a temporary file for the output
-        fd, output_path = tempfile.mkstemp(suffix='.wav')
-        os.close(fd)
-        
-        # Generate speech
-        logger.info(f"Generating speech for: {text[:50]}...")
-        
-        if reference_audio:
-            # Use voice cloning if reference audio is available
-            tts_model.tts_to_file(
-                text=text,
-                file_path=output_path,
-                speaker_wav=reference_audio,
-                language="en"
-            )
-        else:
-            # Fallback to default voice if reference audio is not available
-            tts_model.tts_to_file(
-                text=text,
-                file_path=output_path,
-                language="en"
-            )
-        
-        logger.info(f"Speech generated and saved to: {output_path}")
+        if not sentences:
+            return
         
-        # Process audio if needed (e.g., normalize volume)
-        if AUDIO_PROCESSING_AVAILABLE:
-            process_audio(output_path)
-        else:
-            logger.warning("Audio processing not available. Skipping audio normalization.")
+        full_audio = normalize_audio(np.concatenate(sentences))
+        audio_bytes = _encode_wav(full_audio, sample_rate)
+        cache_set(key, audio_bytes)
+        logger.info("Speech generated.")
         
-        return output_path
+        yield AudioClip(audio_bytes, len(full_audio) / sample_rate, True)
     
     except Exception as e:
         logger.error(f"Error generating voice clone: {e}")
-        
-        # For demo purposes, create a placeholder file
-        try:
-            fd, output_path = tempfile.mkstemp(suffix='.wav')
-            os.close(fd)
-            
-            logger.info(f"Created placeholder file due to error: {output_path}")
-            return output_path
-        except:
-            return None
+        raise
 
-def process_audio(audio_path):
+def _encode_wav(wav, sample_rate):
     """
-    Process audio file (normalize volume, etc.)
+    Encode a waveform as WAV bytes
     
     Args:
-        audio_path (str): Path to the audio file
+        wav (numpy.ndarray): float32 waveform
+        sample_rate (int): Sample rate of the waveform
+        
+    Returns:
+        bytes: WAV audio data
     """
-    if not AUDIO_PROCESSING_AVAILABLE:
-        logger.warning("Audio processing is not available. Skipping audio normalization.")
-        return
+    # Encode in memory; st.audio plays the bytes directly
+    buffer = io.BytesIO()
+    sf.write(buffer, wav, sample_rate, format='WAV', subtype='PCM_16')
+    return buffer.getvalue()
+
+def normalize_audio(wav, peak=0.99):
+    """
+    Peak-normalize a waveform
     
-    try:
-        # Check if file exists and is not empty
-        if not os.path.exists(audio_path) or os.path.getsize(audio_path) == 0:
-            logger.warning(f"Audio file does not exist or is empty: {audio_path}")
-            return
+    Args:
+        wav (numpy.ndarray): float32 waveform
+        peak (float): Target peak amplitude
         
-        try:
-            # Load audio
-            audio = AudioSegment.from_wav(audio_path)
-            
-            # Normalize volume
-            normalized_audio = audio.normalize()
-            
-            # Export back to the same file
-            normalized_audio.export(audio_path, format="wav")
-            
-            logger.info(f"Audio processed: {audio_path}")
-        except Exception as e:
-            logger.error(f"Error processing audio: {e}")
-            # Continue without processing
-    
-    except Exception as e:
-        logger.error(f"Error in process_audio: {e}")
-        # Continue without processing 
\ No newline at end of file
+    Returns:
+        numpy.ndarray: Normalized waveform
+    """
+    return wav * (peak / (np.max(np.abs(wav)) + 1e-9))